@@ -0,0 +1,60 @@
+"""Benchmark PDF conversion time for Markdown tables of increasing size.
+
+Reports the time per row so the scaling with table size is easy to read:
+
+    uv run python benchmarks/large_tables.py
+    uv run python benchmarks/large_tables.py --rows 1000 2000 4000 8000
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from io import StringIO
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from main import convert_markdown_to_pdf  # noqa: E402
+
+CSS_FILE = Path(__file__).resolve().parent.parent / "stylesheets" / "default.css"
+
+
+def write_table(path, rows):
+    """Write a Markdown file containing a single table with `rows` body rows."""
+    lines = ["| Row | Name | Value |", "| --- | ---- | ----- |"]
+    lines.extend(f"| {i} | Item {i} | {i * 3.14:.2f} |" for i in range(rows))
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+def time_conversion(markdown_path):
+    """Return the number of seconds taken to convert `markdown_path`."""
+    start = time.perf_counter()
+    with redirect_stdout(StringIO()):
+        convert_markdown_to_pdf(markdown_path, CSS_FILE)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark large table conversion")
+    parser.add_argument(
+        "--rows",
+        type=int,
+        nargs="+",
+        default=[500, 1000, 2000, 4000],
+        help="Table sizes (body rows) to benchmark",
+    )
+    args = parser.parse_args()
+
+    print(f"{'rows':>8} {'time (s)':>10} {'us/row':>8}")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for rows in args.rows:
+            markdown_path = Path(temp_dir) / f"table_{rows}.md"
+            write_table(markdown_path, rows)
+            seconds = time_conversion(markdown_path)
+            print(f"{rows:>8} {seconds:>10.2f} {seconds / rows * 1e6:>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,46 @@
 import argparse
+import multiprocessing
+import os
+import pickle
+import signal
 import sys
 import tempfile
 from pathlib import Path
 from xhtml2pdf import pisa
 from markdown import markdownFromFile
 
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+
+# Default limits applied to each isolated conversion
+DEFAULT_TIMEOUT = 60  # seconds
+DEFAULT_MEMORY_LIMIT = 2 * 1024**3  # bytes of address space
+
+# Isolated conversions are forked from a server process that has already imported
+# this module (and so xhtml2pdf and reportlab), which keeps process start-up cheap.
+if "forkserver" in multiprocessing.get_all_start_methods():
+    CONVERSION_CONTEXT = multiprocessing.get_context("forkserver")
+    CONVERSION_CONTEXT.set_forkserver_preload(["main"])
+else:
+    CONVERSION_CONTEXT = multiprocessing.get_context("spawn")
+
+
+class ConversionLimitError(Exception):
+    """Raised when a conversion is stopped for exceeding a resource limit."""
+
+    def __init__(self, message, limit):
+        super().__init__(message)
+        self.limit = limit  # "timeout" or "memory"
+
+
+def _partial_pdf_path(markdown_path):
+    """Return the path a PDF is written to while its conversion is in progress."""
+    pdf_path = Path(markdown_path).with_suffix(".pdf")
+    return pdf_path.with_name(pdf_path.name + ".part")
+
 
 def convert_markdown_to_pdf(markdown_file_path, css_file_path):
     """Convert a Markdown file to PDF with the same base name."""
@@ -33,11 +69,14 @@ def convert_markdown_to_pdf(markdown_file_path, css_file_path):
         print("Created temporary HTML file:", temp_html_path)
 
     # Convert markdown to HTML
-    markdownFromFile(input=str(markdown_path), output=temp_html_path)
+    markdownFromFile(
+        input=str(markdown_path), output=temp_html_path, extensions=["tables"]
+    )
 
     # Read HTML content
     with open(temp_html_path, "r", encoding="utf-8") as f:
         html_body_content = f.read()
+    os.unlink(temp_html_path)
 
     # Read CSS content
     with open(css_path, "r", encoding="utf-8") as f:
@@ -70,10 +109,13 @@ def convert_markdown_to_pdf(markdown_file_path, css_file_path):
         ]
     )
 
-    # Generate PDF
+    # Generate PDF, writing to a partial file first so an interrupted conversion
+    # never leaves a truncated PDF at the final path
     pdf_path = markdown_path.with_suffix(".pdf")
-    with open(pdf_path, "wb") as result_file:
+    partial_pdf_path = _partial_pdf_path(markdown_path)
+    with open(partial_pdf_path, "wb") as result_file:
         pisa_status = pisa.CreatePDF(html_content, dest=result_file, encoding="UTF-8")
+    os.replace(partial_pdf_path, pdf_path)
 
     # Check for errors
     if pisa_status.err:
@@ -84,11 +126,119 @@ def convert_markdown_to_pdf(markdown_file_path, css_file_path):
     return str(pdf_path)
 
 
+def _convert_in_child(conn, markdown_file_path, css_file_path, memory_limit):
+    """Run a conversion in a child process and send the outcome back to the parent."""
+    if resource is not None and memory_limit:
+        resource.setrlimit(resource.RLIMIT_AS, (memory_limit, memory_limit))
+
+    try:
+        result = ("ok", convert_markdown_to_pdf(markdown_file_path, css_file_path))
+    except MemoryError:
+        result = ("memory", None)
+    except Exception as e:
+        # Send the pickled exception alongside a description, so the parent can still
+        # report the error if the exception can't be pickled or unpickled
+        try:
+            pickled_error = pickle.dumps(e)
+        except Exception:
+            pickled_error = None
+        result = ("error", (pickled_error, f"{type(e).__name__}: {e}"))
+
+    try:
+        conn.send(result)
+    except MemoryError:
+        conn.send(("memory", None))
+    finally:
+        conn.close()
+
+
+def _unpickle_error(pickled_error, description):
+    """Rebuild an exception sent by _convert_in_child, or a RuntimeError describing it."""
+    if pickled_error is not None:
+        try:
+            return pickle.loads(pickled_error)
+        except Exception:
+            pass
+    return RuntimeError(description)
+
+
+def convert_markdown_to_pdf_isolated(
+    markdown_file_path,
+    css_file_path,
+    timeout=DEFAULT_TIMEOUT,
+    memory_limit=DEFAULT_MEMORY_LIMIT,
+):
+    """Convert a Markdown file to PDF in a separate process with time and memory limits.
+
+    Raises ConversionLimitError if the conversion runs longer than `timeout` seconds
+    or exceeds `memory_limit` bytes of address space, and RuntimeError if the
+    conversion process exits without reporting a result. Errors raised by
+    convert_markdown_to_pdf are re-raised in the calling process.
+    """
+    parent_conn, child_conn = CONVERSION_CONTEXT.Pipe(duplex=False)
+    process = CONVERSION_CONTEXT.Process(
+        target=_convert_in_child,
+        args=(child_conn, str(markdown_file_path), str(css_file_path), memory_limit),
+        daemon=True,
+    )
+    process.start()
+    child_conn.close()
+
+    try:
+        if not parent_conn.poll(timeout):
+            raise ConversionLimitError(
+                f"Conversion exceeded the time limit of {timeout} seconds", "timeout"
+            )
+        try:
+            status, value = parent_conn.recv()
+        except EOFError:
+            process.join()
+            if (
+                resource is not None
+                and memory_limit
+                and process.exitcode == -signal.SIGKILL
+            ):
+                # Killed by the OOM killer after exceeding the memory limit
+                raise ConversionLimitError(
+                    f"Conversion process was killed by signal {-process.exitcode}",
+                    "memory",
+                )
+            raise RuntimeError(
+                f"Conversion process exited unexpectedly (exit code {process.exitcode})"
+            )
+    finally:
+        parent_conn.close()
+        if process.is_alive():
+            process.kill()
+        process.join()
+        Path(_partial_pdf_path(markdown_file_path)).unlink(missing_ok=True)
+
+    if status == "memory":
+        raise ConversionLimitError(
+            f"Conversion exceeded the memory limit of {memory_limit} bytes", "memory"
+        )
+    if status == "error":
+        raise _unpickle_error(*value)
+    return value
+
+
 def main():
     """Main entry point for the script."""
     parser = argparse.ArgumentParser(description="Convert Markdown to PDF")
     parser.add_argument("markdown_file", help="Path to the markdown file")
     parser.add_argument("--css", help="Path to custom CSS file (optional)")
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=DEFAULT_TIMEOUT,
+        help=f"Maximum conversion time in seconds (default: {DEFAULT_TIMEOUT})",
+    )
+    parser.add_argument(
+        "--memory-limit",
+        type=int,
+        default=DEFAULT_MEMORY_LIMIT,
+        help=f"Maximum conversion memory in bytes (default: {DEFAULT_MEMORY_LIMIT})",
+    )
 
     args = parser.parse_args()
 
@@ -96,8 +246,10 @@ def main():
     css_file = args.css or "stylesheets/default.css"  # Use default if not provided
 
     try:
-        convert_markdown_to_pdf(markdown_file, css_file)
-    except (FileNotFoundError, ValueError) as e:
+        convert_markdown_to_pdf_isolated(
+            markdown_file, css_file, args.timeout, args.memory_limit
+        )
+    except (FileNotFoundError, ValueError, ConversionLimitError) as e:
         print(f"Error: {e}")
         sys.exit(1)
     except Exception as e:
@@ -0,0 +1,180 @@
+import heapq
+import itertools
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+
+# Relative cost weights used by estimate_cost, in units of one byte of Markdown
+TABLE_CELL_COST = 50
+CODE_BLOCK_COST = 500
+IMAGE_COST = 2000
+
+
+def estimate_cost(markdown_text):
+    """Estimate the relative cost of converting Markdown text to PDF.
+
+    Uses cheap statistics only: byte size, table cells, fenced code blocks and images.
+    Each is counted in a single pass over the text, so hostile input can't make
+    estimating the cost expensive.
+    """
+    table_cells = 0
+    code_fences = 0
+    for line in markdown_text.splitlines():
+        line = line.strip()
+        if len(line) > 1 and line.startswith("|") and line.endswith("|"):
+            table_cells += line.count("|") - 1
+        elif line.startswith(("```", "~~~")):
+            code_fences += 1
+    code_blocks = code_fences // 2
+    images = markdown_text.count("![")
+    return (
+        len(markdown_text.encode("utf-8"))
+        + table_cells * TABLE_CELL_COST
+        + code_blocks * CODE_BLOCK_COST
+        + images * IMAGE_COST
+    )
+
+
+class ConversionScheduler:
+    """Run conversion jobs on a pool of worker threads in per-client fair order.
+
+    Jobs are ordered by start-time fair queueing: each job is tagged with its
+    client's share of work done so far, so a client submitting many expensive jobs
+    is served after clients with less outstanding work, but still makes progress.
+    """
+
+    def __init__(self, workers=2, history=1000):
+        self._condition = threading.Condition()
+        self._queue = []  # Heap of (start_tag, sequence, job)
+        self._sequence = itertools.count()
+        self._virtual_time = 0.0
+        self._client_finish_tags = {}
+        self._history = deque(maxlen=history)
+        self._completed = 0
+        self._shutdown = False
+        self._workers = [
+            threading.Thread(target=self._run, daemon=True) for _ in range(workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def submit(self, client_id, cost, fn, *args, **kwargs):
+        """Queue `fn(*args, **kwargs)` for `client_id` and return a Future for its result."""
+        future = Future()
+        with self._condition:
+            if self._shutdown:
+                raise RuntimeError(
+                    "Cannot submit jobs after the scheduler is shut down"
+                )
+            start_tag = max(
+                self._virtual_time, self._client_finish_tags.get(client_id, 0.0)
+            )
+            self._client_finish_tags[client_id] = start_tag + cost
+            job = {
+                "client_id": client_id,
+                "cost": cost,
+                "fn": fn,
+                "args": args,
+                "kwargs": kwargs,
+                "future": future,
+                "queued_at": time.monotonic(),
+            }
+            heapq.heappush(self._queue, (start_tag, next(self._sequence), job))
+            self._condition.notify()
+        return future
+
+    def shutdown(self, wait=True):
+        """Stop the worker threads after the jobs already queued have run."""
+        with self._condition:
+            self._shutdown = True
+            self._condition.notify_all()
+        if wait:
+            for worker in self._workers:
+                worker.join()
+
+    def stats(self):
+        """Return queue length, queue wait times and cost estimates of recent jobs.
+
+        Client ids are left out so the stats don't reveal who submitted each job.
+        """
+        with self._condition:
+            recent = list(self._history)
+            queued = len(self._queue)
+            completed = self._completed
+        waits = [job["wait_seconds"] for job in recent]
+        return {
+            "queued": queued,
+            "completed": completed,
+            "workers": len(self._workers),
+            "mean_wait_seconds": sum(waits) / len(waits) if waits else 0.0,
+            "max_wait_seconds": max(waits, default=0.0),
+            "recent": recent,
+        }
+
+    def _next_job(self):
+        with self._condition:
+            while not self._queue and not self._shutdown:
+                self._condition.wait()
+            if not self._queue:
+                return None
+            start_tag, _, job = heapq.heappop(self._queue)
+            self._virtual_time = start_tag
+            # Clients with no outstanding work would restart at the virtual time anyway
+            self._client_finish_tags = {
+                client_id: finish_tag
+                for client_id, finish_tag in self._client_finish_tags.items()
+                if finish_tag > self._virtual_time
+            }
+            self._history.append(
+                {
+                    "cost": job["cost"],
+                    "wait_seconds": time.monotonic() - job["queued_at"],
+                }
+            )
+            return job
+
+    def _run(self):
+        while True:
+            job = self._next_job()
+            if job is None:
+                return
+            future = job["future"]
+            if future.set_running_or_notify_cancel():
+                try:
+                    future.set_result(job["fn"](*job["args"], **job["kwargs"]))
+                except Exception as e:
+                    future.set_exception(e)
+            with self._condition:
+                self._completed += 1
+
+
+class SingleFlight:
+    """Coalesce identical in-flight jobs so only one runs and every caller shares its result."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._in_flight = {}
+        self.coalesced = 0
+
+    def submit(self, key, submit_fn):
+        """Return the in-flight Future for `key`, or start one by calling `submit_fn()`.
+
+        `submit_fn` must return a Future. Its result or error is shared by every caller
+        that submits the same key before it completes.
+        """
+        with self._lock:
+            future = self._in_flight.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return future
+            future = submit_fn()
+            self._in_flight[key] = future
+        future.add_done_callback(lambda done: self._forget(key, done))
+        return future
+
+    def _forget(self, key, future):
+        with self._lock:
+            if self._in_flight.get(key) is future:
+                del self._in_flight[key]
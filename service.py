@@ -1,4 +1,8 @@
+import hashlib
 import os
+import tempfile
+import threading
+from collections import Counter
 from pathlib import Path
 from flask import (
     Flask,
@@ -6,12 +10,19 @@ from flask import (
     request,
     redirect,
     render_template,
+    jsonify,
     send_from_directory,
     url_for,
 )
 from werkzeug.utils import secure_filename
 
-from main import convert_markdown_to_pdf
+from main import (
+    DEFAULT_MEMORY_LIMIT,
+    DEFAULT_TIMEOUT,
+    ConversionLimitError,
+    convert_markdown_to_pdf_isolated,
+)
+from scheduler import ConversionScheduler, SingleFlight, estimate_cost
 
 
 # Get the directory containing this file and create uploads folder
@@ -26,12 +37,74 @@ app = Flask(__name__)
 app.config["UPLOAD_DIR"] = str(UPLOAD_DIR)
 app.config["UPLOAD_FOLDER"] = UPLOAD_FOLDER
 app.config["SECRET_KEY"] = "dev-secret-key-change-in-production"
+app.config["CONVERSION_TIMEOUT"] = DEFAULT_TIMEOUT
+app.config["CONVERSION_MEMORY_LIMIT"] = DEFAULT_MEMORY_LIMIT
+app.config["CONVERSION_WORKERS"] = 2
+
+# Guards creation of the conversion scheduler, see get_scheduler
+scheduler_lock = threading.Lock()
+
+# Identical concurrent uploads share a single conversion
+single_flight = SingleFlight()
+
+# Count of conversions stopped per limit ("timeout" or "memory")
+conversion_limit_counts = Counter()
+conversion_limit_counts_lock = threading.Lock()
 
 
 def allowed_file(filename):
     return "." in filename and filename.rsplit(".", 1)[1].lower() in ALLOWED_EXTENSIONS
 
 
+def conversion_key(markdown_content, css_path, **options):
+    """Hash Markdown content, stylesheet and conversion options to identify a conversion."""
+    digest = hashlib.sha256(markdown_content)
+    with open(css_path, "rb") as f:
+        digest.update(f.read())
+    digest.update(repr(sorted(options.items())).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def save_markdown(markdown_content, key):
+    """Save uploaded Markdown under its conversion key and return the path.
+
+    Content-addressed paths mean a queued conversion always renders exactly the
+    content its key was computed from, even if another upload has the same name.
+    """
+    markdown_path = Path(app.config["UPLOAD_DIR"]) / f"{key}.md"
+    if not markdown_path.exists():
+        with tempfile.NamedTemporaryFile(
+            dir=app.config["UPLOAD_DIR"], suffix=".md.part", delete=False
+        ) as temp_file:
+            temp_file.write(markdown_content)
+        os.replace(temp_file.name, markdown_path)
+    return str(markdown_path)
+
+
+def get_scheduler():
+    """Return the conversion scheduler, creating it from the app config on first use.
+
+    Conversions are queued per client so one client's large jobs can't starve others.
+    """
+    with scheduler_lock:
+        if "conversion_scheduler" not in app.extensions:
+            app.extensions["conversion_scheduler"] = ConversionScheduler(
+                workers=app.config["CONVERSION_WORKERS"]
+            )
+        return app.extensions["conversion_scheduler"]
+
+
+def render_pdf(markdown_path, css_file, **options):
+    """Run one isolated conversion, recording it if it is stopped by a limit."""
+    try:
+        return convert_markdown_to_pdf_isolated(markdown_path, css_file, **options)
+    except ConversionLimitError as e:
+        with conversion_limit_counts_lock:
+            conversion_limit_counts[e.limit] += 1
+        app.logger.warning("Conversion of %s stopped: %s", markdown_path, e)
+        raise
+
+
 @app.route("/", methods=["GET", "POST"])
 def upload_file():
     if request.method == "POST":
@@ -47,11 +120,33 @@ def upload_file():
             return redirect(request.url)
         if file and allowed_file(file.filename):
             filename = secure_filename(file.filename)
-            file.save(os.path.join(app.config["UPLOAD_DIR"], filename))
-            pdf_file = convert_markdown_to_pdf(
-                os.path.join(app.config["UPLOAD_DIR"], filename),
-                "stylesheets/default.css",  # Default CSS file for first version
-            )
+            markdown_content = file.read()
+            css_file = "stylesheets/default.css"  # Default CSS file for first version
+            options = {
+                "timeout": app.config["CONVERSION_TIMEOUT"],
+                "memory_limit": app.config["CONVERSION_MEMORY_LIMIT"],
+            }
+            key = conversion_key(markdown_content, css_file, **options)
+            markdown_path = save_markdown(markdown_content, key)
+            cost = estimate_cost(markdown_content.decode("utf-8", errors="replace"))
+            try:
+                pdf_file = single_flight.submit(
+                    key,
+                    lambda: get_scheduler().submit(
+                        request.remote_addr,
+                        cost,
+                        render_pdf,
+                        markdown_path,
+                        css_file,
+                        **options,
+                    ),
+                ).result()
+            except ConversionLimitError:
+                flash(
+                    "Your file is too large or complex to convert. Please try a smaller file.",
+                    "error",
+                )
+                return redirect(request.url)
             # Extract just the filename from the full path returned by convert_markdown_to_pdf
             pdf_filename = os.path.basename(pdf_file)
             flash("Your file has been converted successfully!", "success")
@@ -59,8 +154,13 @@ def upload_file():
             # Legacy - initially had automatic download here, but for better UX moved to template and triggered download with JS
             # return redirect(url_for("download_file", name=pdf_filename))
             
-            # Pass the download URL to the template to trigger automatic download
-            download_url = url_for("download_file", name=pdf_filename)
+            # Pass the download URL to the template to trigger automatic download,
+            # naming the download after the uploaded file rather than its key
+            download_url = url_for(
+                "download_file",
+                name=pdf_filename,
+                filename=Path(filename).with_suffix(".pdf").name,
+            )
             return render_template(
                 "index.jinja",
                 title="Markdown to PDF Converter",
@@ -72,9 +172,28 @@ def upload_file():
     return render_template("index.jinja", title="Markdown to PDF Converter")
 
 
+@app.route("/scheduler/stats")
+def scheduler_stats():
+    with conversion_limit_counts_lock:
+        conversion_limits = dict(conversion_limit_counts)
+    return jsonify(
+        get_scheduler().stats()
+        | {
+            "coalesced": single_flight.coalesced,
+            "conversion_limits": conversion_limits,
+        }
+    )
+
+
 @app.route("/uploads/<name>")
 def download_file(name):
-    return send_from_directory(app.config["UPLOAD_FOLDER"], name, as_attachment=True)
+    download_name = secure_filename(request.args.get("filename", "")) or name
+    return send_from_directory(
+        app.config["UPLOAD_FOLDER"],
+        name,
+        as_attachment=True,
+        download_name=download_name,
+    )
 
 
 if __name__ == "__main__":
@@ -4,9 +4,16 @@ import pytest
 import sys
 import tempfile
 import os
+import multiprocessing
+import signal
+import time
 
 from unittest.mock import patch
-from main import convert_markdown_to_pdf
+from main import (
+    ConversionLimitError,
+    convert_markdown_to_pdf,
+    convert_markdown_to_pdf_isolated,
+)
 
 
 def test_markdown_file_not_found_error():
@@ -161,3 +168,150 @@ def test_main_value_error():
     finally:
         # Clean up the temporary file
         os.unlink(temp_file_path)
+
+
+def test_isolated_conversion_creates_pdf(tmp_path):
+    """Test that convert_markdown_to_pdf_isolated converts a file in a child process."""
+    md_file = tmp_path / "isolated.md"
+    md_file.write_text("# Heading\n\nSome content")
+
+    pdf_file = convert_markdown_to_pdf_isolated(md_file, "stylesheets/default.css")
+
+    assert pdf_file == str(tmp_path / "isolated.pdf")
+    assert os.path.exists(pdf_file)
+
+
+def test_isolated_conversion_reraises_errors():
+    """Test that errors raised in the child process are re-raised in the caller."""
+    with pytest.raises(FileNotFoundError, match="Markdown file not found"):
+        convert_markdown_to_pdf_isolated(
+            "this_file_does_not_exist.md", "stylesheets/default.css"
+        )
+
+
+def test_isolated_conversion_timeout(tmp_path):
+    """Test that a conversion exceeding the time limit raises ConversionLimitError."""
+    md_file = tmp_path / "slow.md"
+    md_file.write_text("Some content")
+
+    with pytest.raises(ConversionLimitError, match="time limit") as exc_info:
+        convert_markdown_to_pdf_isolated(md_file, "stylesheets/default.css", timeout=0)
+
+    assert exc_info.value.limit == "timeout"
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="Memory limits require POSIX")
+def test_isolated_conversion_memory_limit(tmp_path):
+    """Test that a conversion exceeding the memory limit raises ConversionLimitError."""
+    md_file = tmp_path / "large.md"
+    md_file.write_text("Some content")
+
+    with pytest.raises(ConversionLimitError) as exc_info:
+        convert_markdown_to_pdf_isolated(
+            md_file, "stylesheets/default.css", memory_limit=1
+        )
+
+    assert exc_info.value.limit == "memory"
+
+
+def test_isolated_conversion_cleans_up_partial_pdf_on_timeout(tmp_path):
+    """Test that a partial PDF written before a timeout is deleted."""
+    md_file = tmp_path / "slow.md"
+    md_file.write_text("Some content")
+    partial_pdf = tmp_path / "slow.pdf.part"
+
+    def slow_child(conn, markdown_file_path, css_file_path, memory_limit):
+        partial_pdf.write_bytes(b"%PDF-")
+        time.sleep(30)
+
+    with patch("main.CONVERSION_CONTEXT", multiprocessing.get_context("fork")):
+        with patch("main._convert_in_child", slow_child):
+            with pytest.raises(ConversionLimitError, match="time limit"):
+                convert_markdown_to_pdf_isolated(
+                    md_file, "stylesheets/default.css", timeout=1
+                )
+
+    assert not partial_pdf.exists()
+    assert not (tmp_path / "slow.pdf").exists()
+
+
+def test_isolated_conversion_unexpected_exit(tmp_path):
+    """Test that a child exiting without a result is only a memory limit if killed by SIGKILL."""
+    md_file = tmp_path / "exit.md"
+    md_file.write_text("Some content")
+
+    def exiting_child(conn, markdown_file_path, css_file_path, memory_limit):
+        os._exit(3)
+
+    def crashing_child(conn, markdown_file_path, css_file_path, memory_limit):
+        os.kill(os.getpid(), signal.SIGTERM)
+
+    def killed_child(conn, markdown_file_path, css_file_path, memory_limit):
+        os.kill(os.getpid(), signal.SIGKILL)
+
+    with patch("main.CONVERSION_CONTEXT", multiprocessing.get_context("fork")):
+        with patch("main._convert_in_child", exiting_child):
+            with pytest.raises(RuntimeError, match="exit code 3"):
+                convert_markdown_to_pdf_isolated(md_file, "stylesheets/default.css")
+
+        with patch("main._convert_in_child", crashing_child):
+            with pytest.raises(RuntimeError, match="exit code -15"):
+                convert_markdown_to_pdf_isolated(md_file, "stylesheets/default.css")
+
+        with patch("main._convert_in_child", killed_child):
+            # Without a memory limit a SIGKILL is not a limit hit
+            with pytest.raises(RuntimeError, match="exit code -9"):
+                convert_markdown_to_pdf_isolated(
+                    md_file, "stylesheets/default.css", memory_limit=None
+                )
+
+            with pytest.raises(ConversionLimitError) as exc_info:
+                convert_markdown_to_pdf_isolated(md_file, "stylesheets/default.css")
+            assert exc_info.value.limit == "memory"
+
+
+class UnpicklableError(Exception):
+    def __reduce__(self):
+        raise TypeError("cannot pickle")
+
+
+class TwoArgError(Exception):
+    def __init__(self, first, second):
+        super().__init__(f"{first} {second}")
+
+
+@pytest.mark.parametrize(
+    "error", [UnpicklableError("spam"), TwoArgError("spam", "eggs")]
+)
+def test_isolated_conversion_reports_errors_that_cannot_be_sent(tmp_path, error):
+    """Test that errors which can't be pickled or unpickled are raised as RuntimeError."""
+    md_file = tmp_path / "error.md"
+    md_file.write_text("Some content")
+
+    with patch("main.CONVERSION_CONTEXT", multiprocessing.get_context("fork")):
+        with patch("main.convert_markdown_to_pdf", side_effect=error):
+            with pytest.raises(RuntimeError, match=f"{type(error).__name__}: spam"):
+                convert_markdown_to_pdf_isolated(md_file, "stylesheets/default.css")
+
+
+def test_markdown_tables_are_rendered():
+    """Test that convert_markdown_to_pdf renders Markdown tables as HTML tables."""
+    with tempfile.NamedTemporaryFile(
+        mode="w", suffix=".md", delete=False
+    ) as temp_md_file:
+        temp_md_file.write("| Row |\n| --- |\n| 1 |\n")
+        temp_md_file_path = temp_md_file.name
+
+    try:
+        with patch("main.pisa.CreatePDF") as mock_create_pdf:
+            mock_create_pdf.return_value.err = False
+
+            convert_markdown_to_pdf(temp_md_file_path, "stylesheets/default.css")
+
+            html_content = mock_create_pdf.call_args[0][0]
+            assert "<table>" in html_content
+            assert "<th>Row</th>" in html_content
+            assert "<td>1</td>" in html_content
+    finally:
+        os.unlink(temp_md_file_path)
+        os.unlink(os.path.splitext(temp_md_file_path)[0] + ".pdf")
@@ -0,0 +1,162 @@
+"""Unit tests for scheduler.py"""
+
+import threading
+import time
+import pytest
+
+from concurrent.futures import Future
+from scheduler import ConversionScheduler, SingleFlight, estimate_cost
+
+
+class TestEstimateCost:
+    """Tests for the estimate_cost function"""
+
+    @pytest.mark.unit
+    def test_plain_text_costs_its_byte_size(self):
+        """Test that plain text is costed by its UTF-8 byte size."""
+        assert estimate_cost("abc") == 3
+        assert estimate_cost("é") == 2
+
+    @pytest.mark.unit
+    def test_tables_code_blocks_and_images_add_cost(self):
+        """Test that tables, code blocks and images cost more than their byte size."""
+        table = "| a | b |\n| - | - |\n| 1 | 2 |\n"
+        code = "```\nprint('spam')\n```\n"
+        image = "![eggs](eggs.png)\n"
+
+        assert estimate_cost(table) > len(table)
+        assert estimate_cost(code) > len(code)
+        assert estimate_cost(image) > len(image)
+        # More rows means more cost
+        assert estimate_cost(table + "| 3 | 4 |\n") > estimate_cost(table)
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("unit", [" \n", "\n", "![", "|"])
+    def test_hostile_input_is_costed_in_linear_time(self, unit):
+        """Test that large whitespace-only or unclosed-markup input is costed quickly."""
+        markdown_text = unit * 500_000
+
+        start = time.perf_counter()
+        estimate_cost(markdown_text)
+
+        assert time.perf_counter() - start < 1
+
+
+@pytest.fixture
+def scheduler():
+    scheduler = ConversionScheduler(workers=1)
+    yield scheduler
+    scheduler.shutdown()
+
+
+class TestConversionScheduler:
+    """Tests for the ConversionScheduler class"""
+
+    @pytest.mark.unit
+    def test_submit_returns_result(self, scheduler):
+        """Test that submit returns a Future resolving to the job's result."""
+
+        assert scheduler.submit("client", 1, sum, [1, 2, 3]).result(timeout=5) == 6
+
+    @pytest.mark.unit
+    def test_submit_propagates_errors(self, scheduler):
+        """Test that errors raised by a job are raised from its Future."""
+
+        def fail():
+            raise ValueError("spam")
+
+        with pytest.raises(ValueError, match="spam"):
+            scheduler.submit("client", 1, fail).result(timeout=5)
+
+    @pytest.mark.unit
+    def test_light_client_is_not_starved_by_heavy_client(self, scheduler):
+        """Test that a small job from one client runs before another client's backlog."""
+        release = threading.Event()
+        order = []
+
+        # Occupy the only worker so the remaining jobs queue up
+        blocker = scheduler.submit("blocker", 0, release.wait)
+        heavy = [
+            scheduler.submit("heavy", 100, order.append, f"heavy-{i}") for i in range(3)
+        ]
+        light = scheduler.submit("light", 1, order.append, "light")
+        release.set()
+
+        for future in [blocker, light, *heavy]:
+            future.result(timeout=5)
+        assert order == ["heavy-0", "light", "heavy-1", "heavy-2"]
+
+    @pytest.mark.unit
+    def test_stats_reports_waits_and_costs(self, scheduler):
+        """Test that stats exposes queue wait times and cost estimates."""
+        scheduler.submit("client", 42, int).result(timeout=5)
+
+        stats = scheduler.stats()
+
+        assert stats["queued"] == 0
+        assert stats["workers"] == 1
+        assert "client_id" not in stats["recent"][0]
+        assert stats["recent"][0]["cost"] == 42
+        assert stats["recent"][0]["wait_seconds"] >= 0
+        assert stats["max_wait_seconds"] >= stats["mean_wait_seconds"] >= 0
+
+    @pytest.mark.unit
+    def test_shutdown_runs_queued_jobs_and_stops_workers(self):
+        """Test that shutdown finishes queued jobs, stops workers and rejects new jobs."""
+        scheduler = ConversionScheduler(workers=2)
+        futures = [scheduler.submit("client", 1, int, i) for i in range(5)]
+
+        scheduler.shutdown()
+
+        assert [future.result(timeout=5) for future in futures] == list(range(5))
+        assert not any(worker.is_alive() for worker in scheduler._workers)
+        with pytest.raises(RuntimeError, match="shut down"):
+            scheduler.submit("client", 1, int)
+
+
+class TestSingleFlight:
+    """Tests for the SingleFlight class"""
+
+    @pytest.mark.unit
+    def test_identical_in_flight_jobs_share_one_future(self):
+        """Test that a key submitted while in flight reuses the first Future."""
+        single_flight = SingleFlight()
+        pending = Future()
+        calls = []
+
+        def submit_fn():
+            calls.append(1)
+            return pending
+
+        first = single_flight.submit("key", submit_fn)
+        second = single_flight.submit("key", submit_fn)
+        pending.set_result("spam.pdf")
+
+        assert first is second
+        assert len(calls) == 1
+        assert single_flight.coalesced == 1
+        assert second.result(timeout=5) == "spam.pdf"
+
+    @pytest.mark.unit
+    def test_errors_reach_all_waiters(self):
+        """Test that an error from the shared job is raised for every caller."""
+        single_flight = SingleFlight()
+        pending = Future()
+
+        futures = [single_flight.submit("key", lambda: pending) for _ in range(3)]
+        pending.set_exception(ValueError("spam"))
+
+        for future in futures:
+            with pytest.raises(ValueError, match="spam"):
+                future.result(timeout=5)
+
+    @pytest.mark.unit
+    def test_completed_jobs_are_not_reused(self):
+        """Test that a key submitted after its job completes starts a new job."""
+        single_flight = SingleFlight()
+        first = Future()
+        first.set_result("first")
+        second = Future()
+
+        assert single_flight.submit("key", lambda: first).result() == "first"
+        assert single_flight.submit("key", lambda: second) is second
@@ -1,17 +1,24 @@
 """Unit and integration tests for service.py"""
 
 from io import BytesIO
+import threading
+import time
 import pytest
 
 from contextlib import contextmanager
+from unittest.mock import patch
 from flask import get_flashed_messages, template_rendered
-from service import allowed_file, app as flask_app
+from service import allowed_file, conversion_key, get_scheduler, app as flask_app
 
 
 @pytest.fixture
 def app():
     flask_app.config["TESTING"] = True
     yield flask_app
+    # Stop the scheduler's worker threads so each test starts with a fresh one
+    scheduler = flask_app.extensions.pop("conversion_scheduler", None)
+    if scheduler is not None:
+        scheduler.shutdown()
 
 
 @pytest.fixture
@@ -77,6 +84,20 @@ class TestAllowedFile:
         assert allowed_file("document.pdf") is False
 
 
+class TestConversionKey:
+    """Tests for the conversion_key function"""
+
+    @pytest.mark.unit
+    def test_conversion_key(self):
+        """Test that conversion_key changes with Markdown, stylesheet and options."""
+        key = conversion_key(b"content", "stylesheets/default.css", timeout=60)
+
+        assert key == conversion_key(b"content", "stylesheets/default.css", timeout=60)
+        assert key != conversion_key(b"other", "stylesheets/default.css", timeout=60)
+        assert key != conversion_key(b"content", "stylesheets/minimal.css", timeout=60)
+        assert key != conversion_key(b"content", "stylesheets/default.css", timeout=30)
+
+
 class TestSuccessfulFileUpload:
     """Successful upload tests"""
 
@@ -113,16 +134,139 @@ class TestSuccessfulFileUpload:
 
 
     @pytest.mark.integration
-    def test_download_file(self, client):
+    def test_download_file(self, client, app):
         """Test the download_file route serves the file correctly after upload"""
 
+        with captured_templates(app) as templates:
+            data = {"file": (BytesIO(b"content"), "test.md")}
+            client.post("/", data=data, content_type="multipart/form-data")
+        _, context = templates[0]
+        response = client.get(context["download_url"])
+
+        # Check we got a successful response named after the uploaded file
+        assert response.status_code == 200
+        assert "filename=test.pdf" in response.headers["Content-Disposition"]
+
+    @pytest.mark.integration
+    def test_uploads_are_stored_by_content(self, client, app):
+        """Test that uploads with the same name but different content get different PDFs"""
+
+        download_urls = []
+        for content in [b"first", b"second"]:
+            with captured_templates(app) as templates:
+                data = {"file": (BytesIO(content), "test.md")}
+                client.post("/", data=data, content_type="multipart/form-data")
+            download_urls.append(templates[0][1]["download_url"])
+
+        assert download_urls[0] != download_urls[1]
+        key = conversion_key(
+            b"first",
+            "stylesheets/default.css",
+            timeout=app.config["CONVERSION_TIMEOUT"],
+            memory_limit=app.config["CONVERSION_MEMORY_LIMIT"],
+        )
+        assert download_urls[0].startswith(f"/uploads/{key}.pdf")
+
+
+
+class TestSchedulerStats:
+    """Tests for the scheduler stats endpoint"""
+
+    @pytest.mark.integration
+    def test_scheduler_stats_after_upload(self, client):
+        """Test that scheduler stats include the cost of an uploaded file."""
         data = {"file": (BytesIO(b"content"), "test.md")}
         client.post("/", data=data, content_type="multipart/form-data")
-        response = client.get("/uploads/test.pdf")
+        response = client.get("/scheduler/stats")
 
-        # Check we got a successful response
         assert response.status_code == 200
+        stats = response.get_json()
+        assert stats["recent"][-1]["cost"] == len(b"content")
+        assert "client_id" not in stats["recent"][-1]
+
+    @pytest.mark.unit
+    def test_scheduler_uses_configured_workers(self, app, monkeypatch):
+        """Test that the scheduler is created with CONVERSION_WORKERS workers."""
+        monkeypatch.setitem(app.config, "CONVERSION_WORKERS", 3)
+
+        assert get_scheduler().stats()["workers"] == 3
+
+
+class TestCoalescedUploads:
+    """Tests for identical concurrent uploads sharing one conversion"""
+
+    @pytest.mark.integration
+    def test_identical_concurrent_uploads_share_one_render(self, app):
+        """Test that two identical uploads in flight run one conversion and share its error."""
+        from main import ConversionLimitError
+        from service import conversion_limit_counts, single_flight
+
+        release = threading.Event()
+        calls = []
+
+        def blocking_convert(markdown_path, css_file, **options):
+            calls.append(markdown_path)
+            release.wait(timeout=5)
+            raise ConversionLimitError("Conversion exceeded the time limit", "timeout")
+
+        def upload(responses):
+            data = {"file": (BytesIO(b"shared content"), "shared.md")}
+            responses.append(
+                app.test_client().post(
+                    "/", data=data, content_type="multipart/form-data"
+                )
+            )
+
+        coalesced_before = single_flight.coalesced
+        timeouts_before = conversion_limit_counts["timeout"]
+        responses = []
+        with patch("service.convert_markdown_to_pdf_isolated", blocking_convert):
+            threads = [
+                threading.Thread(target=upload, args=(responses,)) for _ in range(2)
+            ]
+            for thread in threads:
+                thread.start()
+            # Wait until the second upload has joined the first one's conversion
+            deadline = time.monotonic() + 5
+            while single_flight.coalesced == coalesced_before:
+                assert time.monotonic() < deadline
+                time.sleep(0.01)
+            release.set()
+            for thread in threads:
+                thread.join(timeout=5)
+
+        assert len(calls) == 1
+        assert [response.status_code for response in responses] == [302, 302]
+        assert conversion_limit_counts["timeout"] == timeouts_before + 1
+
+
+class TestConversionLimits:
+    """Tests for conversions stopped by time or memory limits"""
+
+    @pytest.mark.integration
+    def test_conversion_timeout_flash_and_redirect(self, client, app, monkeypatch):
+        """Test that a conversion exceeding its time limit results in an error flash message and a redirect."""
+        from service import conversion_limit_counts
+
+        monkeypatch.setitem(app.config, "CONVERSION_TIMEOUT", 0)
+        timeouts_before = conversion_limit_counts["timeout"]
+
+        with client:
+            data = {"file": (BytesIO(b"content"), "test.md")}
+            response = client.post("/", data=data, content_type="multipart/form-data")
+
+            # Check we got a redirect response
+            assert response.status_code == 302
+
+            messages = get_flashed_messages()
+            assert (
+                "Your file is too large or complex to convert. Please try a smaller file."
+                in messages
+            )
 
+        assert conversion_limit_counts["timeout"] == timeouts_before + 1
+        stats = client.get("/scheduler/stats").get_json()
+        assert stats["conversion_limits"]["timeout"] == timeouts_before + 1
 
 
 class TestEmptyFileUpload: